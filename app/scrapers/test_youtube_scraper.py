@@ -27,7 +27,7 @@ def main():
             print(f"✅ Found {len(videos)} video(s)")
             print(f"\nFirst video:")
             print(f"  Title: {video['title']}")
-            print(f"  Published: {video['published_at']}")
+            print(f"  Published: {video['published_at_dt']}")
             print(f"  URL: {video['url']}")
             print(f"  Video ID: {video['video_id']}")
         else:
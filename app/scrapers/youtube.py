@@ -1,26 +1,144 @@
 """YouTube scraper for fetching videos from RSS feeds and transcripts."""
 
-import feedparser
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from youtube_transcript_api import YouTubeTranscriptApi
-
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+import aiohttp
+import diskcache
+import fastfeedparser
+import requests_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from enum import Enum
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 # Import exceptions from the public API
-# These are exported from the main package, not from the private _errors module
-try:
-    from youtube_transcript_api import (
-        TranscriptsDisabled,
-        NoTranscriptFound,
-        VideoUnavailable,
-        TooManyRequests,
-    )
-except ImportError:
-    # Fallback if package structure differs - use generic Exception types
-    # This should not occur with the standard youtube-transcript-api package
-    TranscriptsDisabled = Exception
-    NoTranscriptFound = Exception
-    VideoUnavailable = Exception
-    TooManyRequests = Exception
+# These are exported from the main package, not from the private _errors module.
+# RequestBlocked (and its IpBlocked subclass, raised on HTTP 429) replaced
+# TooManyRequests in youtube-transcript-api 1.0.
+from youtube_transcript_api import (
+    TranscriptsDisabled,
+    NoTranscriptFound,
+    VideoUnavailable,
+    RequestBlocked,
+)
+
+from app.services.youtube_transcript import get_transcript_api
+
+logger = logging.getLogger(__name__)
+
+
+# Matches watch, embed and shorts URLs as well as youtu.be short links.
+# Channel feeds link Shorts as youtube.com/shorts/<id>.
+_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?v=|embed/|shorts/)|youtu\.be/)([a-zA-Z0-9_-]{11})'
+)
+_ID_CHARS_RE = re.compile(r'[A-Za-z0-9_-]{11}')
+
+# Shared HTTP session for RSS feeds: pools connections across channels and
+# honours ETag/Last-Modified, so unchanged feeds come back as 304s
+RSS_CACHE_EXPIRE_AFTER = 10 * 60
+RSS_REQUEST_TIMEOUT = 10
+
+_rss_session = requests_cache.CachedSession(
+    '.cache/rss',
+    backend='sqlite',
+    expire_after=RSS_CACHE_EXPIRE_AFTER,
+    cache_control=True,
+)
+
+# Concurrent connection cap for fetch_multiple_channels_async
+ASYNC_MAX_CONNECTIONS = 64
+
+
+class TranscriptCachePolicy(str, Enum):
+    """How get_video_transcript uses the on-disk transcript cache."""
+    ENABLED = 'enabled'    # Serve from the cache, fetch and store on a miss
+    REPLAY = 'replay'      # Only serve cached transcripts, never call YouTube
+    DISABLED = 'disabled'  # Always fetch from YouTube, bypassing the cache
+
+
+def _load_transcript_cache_policy() -> TranscriptCachePolicy:
+    """Read the cache policy from the environment, falling back to 'enabled'."""
+    value = os.getenv('TRANSCRIPT_CACHE_POLICY') or TranscriptCachePolicy.ENABLED.value
+    try:
+        return TranscriptCachePolicy(value.strip().lower())
+    except ValueError:
+        # A typo here shouldn't make the whole scraper unimportable
+        logger.warning(
+            "Unknown TRANSCRIPT_CACHE_POLICY %r, using 'enabled' (allowed: %s)",
+            value,
+            ', '.join(policy.value for policy in TranscriptCachePolicy),
+        )
+        return TranscriptCachePolicy.ENABLED
+
+
+# Set TRANSCRIPT_CACHE_POLICY to 'replay' or 'disabled' to change the default
+TRANSCRIPT_CACHE_POLICY = _load_transcript_cache_policy()
+
+# Published videos don't change, so transcripts can be kept for a long time.
+# Misses get a short TTL so captions added later are still picked up, while
+# unavailable videos and disabled transcripts are skipped for a day. These
+# negative entries only live on disk, so the TTLs hold in long-running processes.
+TRANSCRIPT_CACHE_TTL = 30 * 24 * 60 * 60
+MISSING_TRANSCRIPT_CACHE_TTL = 60 * 60
+UNAVAILABLE_TRANSCRIPT_CACHE_TTL = 24 * 60 * 60
+
+_transcript_cache = diskcache.Cache('.cache/transcripts')
+_CACHE_MISS = object()
+# Stored in place of a transcript when none could be fetched. It is compared by
+# value since it goes through pickling on its way in and out of the cache.
+_NEGATIVE_SENTINEL = '__no_transcript__'
+
+# Backoff schedule for rate-limited transcript requests
+TRANSCRIPT_MAX_ATTEMPTS = 8
+TRANSCRIPT_MAX_BACKOFF = 60
+
+
+class _RateLimiter:
+    """Thread-safe token bucket for pacing requests to YouTube."""
+    
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self.last_update = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1) -> None:
+        """Block until the requested number of tokens is available, then take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self.last_update
+                self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_sec)
+                self.last_update = now
+                
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                
+                wait = (tokens - self.tokens) / self.refill_per_sec
+            
+            # Sleep outside the lock so other threads can refill and check too
+            time.sleep(wait)
+
+
+# Allow short bursts, but average at most two transcript lookups per second
+_transcript_limiter = _RateLimiter(capacity=10, refill_per_sec=2)
+
+# Long-lived pool for transcript fetches, shared by all channels. Its threads
+# outlive each channel, so the per-thread YouTubeTranscriptApi sessions keep
+# their connections to YouTube across channels.
+TRANSCRIPT_MAX_WORKERS = 8
+_transcript_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPT_MAX_WORKERS,
+    thread_name_prefix='transcripts',
+)
 
 
 def get_channel_rss_url(channel_id: str) -> str:
@@ -45,55 +163,87 @@ def get_channel_rss_url(channel_id: str) -> str:
     return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
 
 
-def parse_rss_feed(rss_url: str) -> List[Dict]:
+def parse_rss_feed(rss_url: str, cutoff: Optional[int] = None) -> List[Dict]:
     """
     Parse YouTube RSS feed and extract video information.
     
     Args:
         rss_url: RSS feed URL
+        cutoff: If given, only return videos published at or after this Unix
+            timestamp (seconds). Parsing stops at the first older entry as long as the
+            feed has been newest-first so far.
     
     Returns:
         List of dictionaries containing video information:
         - title: Video title
         - url: Video URL
         - video_id: YouTube video ID
-        - published_at: Published datetime (UTC)
+        - published_at: Published time as Unix timestamp (seconds)
+        - published_at_dt: Published datetime (timezone-aware UTC), for display
         - description: Video description/summary
         - author: Channel name
-        - link: Video link
     """
-    feed = feedparser.parse(rss_url)
-    
-    if feed.bozo and feed.bozo_exception:
-        raise ValueError(f"Failed to parse RSS feed: {feed.bozo_exception}")
+    response = _rss_session.get(rss_url, timeout=RSS_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return _parse_feed_content(response.content, cutoff=cutoff)
+
+
+def _parse_feed_content(content: bytes, cutoff: Optional[int] = None) -> List[Dict]:
+    """Parse downloaded RSS feed bytes into video dictionaries (see parse_rss_feed)."""
+    # fastfeedparser raises ValueError itself when the feed cannot be parsed
+    feed = fastfeedparser.parse(content)
     
     videos = []
+    previous_published_at = None
+    newest_first = True
     
     for entry in feed.entries:
-        # Extract video ID from various possible fields
-        video_id = None
-        if hasattr(entry, 'yt_videoid'):
-            video_id = entry.yt_videoid
-        elif hasattr(entry, 'link'):
-            # Extract from URL if needed
-            video_id = _extract_video_id_from_url(entry.link)
-        
-        # Parse published date
+        # Parse published date. fastfeedparser normalizes RSS (RFC 822) and Atom
+        # dates to ISO 8601 with an explicit offset, or None if unparseable.
         published_at = None
-        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        published_at_dt = None
+        published = getattr(entry, 'published', None)
+        if published:
             try:
-                published_at = datetime(*entry.published_parsed[:6])
-            except (TypeError, ValueError):
+                published_at_dt = datetime.fromisoformat(published).astimezone(timezone.utc)
+                published_at = int(published_at_dt.timestamp())
+            except ValueError:
                 pass
         
+        if cutoff is not None:
+            if published_at is None:
+                continue
+            if previous_published_at is not None and published_at > previous_published_at:
+                newest_first = False
+            previous_published_at = published_at
+            
+            if published_at < cutoff:
+                # Channel feeds are newest-first, so everything after this is older
+                if newest_first:
+                    break
+                continue
+        
+        # fastfeedparser does not expose yt:videoId, so take the ID from the URL
+        video_id = None
+        if hasattr(entry, 'link'):
+            video_id = _extract_video_id_from_url(entry.link)
+        
+        # YouTube keeps the description in <media:group><media:description>,
+        # which fastfeedparser attaches to the media:content item
+        description = ''
+        for media in getattr(entry, 'media_content', None) or []:
+            if media.get('description'):
+                description = media['description']
+                break
+        
         video_data = {
-            'title': entry.get('title', 'Untitled'),
-            'url': entry.get('link', ''),
+            'title': getattr(entry, 'title', 'Untitled'),
+            'url': getattr(entry, 'link', ''),
             'video_id': video_id,
             'published_at': published_at,
-            'description': entry.get('summary', entry.get('description', '')),
-            'author': entry.get('author', ''),
-            'link': entry.get('link', ''),
+            'published_at_dt': published_at_dt,
+            'description': description or getattr(entry, 'description', ''),
+            'author': getattr(entry, 'author', ''),
         }
         videos.append(video_data)
     
@@ -102,81 +252,155 @@ def parse_rss_feed(rss_url: str) -> List[Dict]:
 
 def _extract_video_id_from_url(url: str) -> Optional[str]:
     """Extract YouTube video ID from URL if needed as fallback."""
-    import re
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-        r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    # Bare video IDs are returned as-is without searching for a URL pattern
+    if len(url) == 11 and _ID_CHARS_RE.fullmatch(url):
+        return url
+    
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
 
 
 def get_video_transcript(video_id: str, languages: List[str] = ['en']) -> Optional[str]:
     """
     Fetch transcript for a YouTube video.
     
+    Transcripts are cached on disk under .cache/transcripts according to
+    TRANSCRIPT_CACHE_POLICY. Found transcripts are also memoized in-process.
+    
     Args:
-        video_id: YouTube video ID (11 characters)
+        video_id: YouTube video ID (11 characters) or video URL
         languages: List of language codes to try in order (default: ['en'])
     
     Returns:
         Transcript text as a single string, or None if unavailable
     """
-    if not video_id or len(video_id) != 11:
+    video_id = _extract_video_id_from_url(video_id) if video_id else None
+    if not video_id:
         return None
     
     try:
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        
-        # Try to get transcript in preferred languages
-        for lang in languages:
-            try:
-                transcript = transcript_list.find_transcript([lang])
-                transcript_data = transcript.fetch()
-                # Combine all text segments into a single string
-                return ' '.join([item['text'] for item in transcript_data])
-            except (NoTranscriptFound, TranscriptsDisabled):
-                continue
-        
-        # If preferred languages don't work, try any manually created transcript
+        if TRANSCRIPT_CACHE_POLICY is TranscriptCachePolicy.DISABLED:
+            return _fetch_video_transcript(video_id, languages)
         try:
-            transcript = transcript_list.find_manually_created_transcript(['en'])
-            transcript_data = transcript.fetch()
-            return ' '.join([item['text'] for item in transcript_data])
-        except (NoTranscriptFound, TranscriptsDisabled):
-            pass
-        
-        # Try auto-generated transcript
-        try:
-            transcript = transcript_list.find_generated_transcript(['en'])
-            transcript_data = transcript.fetch()
-            return ' '.join([item['text'] for item in transcript_data])
-        except (NoTranscriptFound, TranscriptsDisabled):
-            pass
-        
-        return None
+            return _get_memoized_transcript(video_id, tuple(languages))
+        except _TranscriptNotMemoized:
+            return None
         
     except VideoUnavailable:
-        print(f"Video {video_id} is unavailable")
+        logger.warning("Video %s is unavailable", video_id)
         return None
-    except TooManyRequests:
-        print(f"Too many requests for video {video_id}")
+    except RequestBlocked:
+        logger.warning("Too many requests for video %s", video_id)
         return None
     except Exception as e:
-        print(f"Error fetching transcript for video {video_id}: {e}")
+        logger.warning("Error fetching transcript for video %s: %s", video_id, e)
         return None
 
 
+class _TranscriptNotMemoized(Exception):
+    """Raised for missing transcripts, since lru_cache does not memoize exceptions."""
+
+
+@lru_cache(maxsize=4096)
+def _get_memoized_transcript(video_id: str, languages: Tuple[str, ...]) -> str:
+    """
+    Serve transcripts from an in-process memo in front of the on-disk cache.
+    
+    Only found transcripts are memoized. Misses raise _TranscriptNotMemoized
+    so the next call goes back to the disk cache, where their TTLs decide when
+    YouTube is asked again.
+    """
+    transcript = _get_cached_transcript(video_id, languages)
+    if transcript is None:
+        raise _TranscriptNotMemoized(video_id)
+    return transcript
+
+
+def _get_cached_transcript(video_id: str, languages: Tuple[str, ...]) -> Optional[str]:
+    """
+    Look up a transcript in the on-disk cache, fetching and storing it on a miss.
+    
+    Videos that are unavailable or have transcripts disabled are cached on
+    disk as negative results for UNAVAILABLE_TRANSCRIPT_CACHE_TTL. They are
+    never memoized in-process, so the video is checked again once that entry
+    expires. Other errors propagate without being cached, so failed fetches
+    are retried on the next call.
+    """
+    key = f"{video_id}:{','.join(languages)}"
+    
+    transcript = _transcript_cache.get(key, default=_CACHE_MISS)
+    if transcript == _NEGATIVE_SENTINEL:
+        return None
+    if transcript is not _CACHE_MISS:
+        return transcript
+    
+    if TRANSCRIPT_CACHE_POLICY is TranscriptCachePolicy.REPLAY:
+        return None
+    
+    try:
+        transcript = _fetch_video_transcript(video_id, list(languages))
+    except (VideoUnavailable, TranscriptsDisabled) as e:
+        # Retrying soon won't help, so skip the round-trip on the next few polls
+        logger.debug("No transcript available for video %s: %s", video_id, type(e).__name__)
+        _transcript_cache.set(key, _NEGATIVE_SENTINEL, expire=UNAVAILABLE_TRANSCRIPT_CACHE_TTL)
+        return None
+    
+    if transcript is None:
+        _transcript_cache.set(key, _NEGATIVE_SENTINEL, expire=MISSING_TRANSCRIPT_CACHE_TTL)
+    else:
+        _transcript_cache.set(key, transcript, expire=TRANSCRIPT_CACHE_TTL)
+    return transcript
+
+
+def _fetch_video_transcript(video_id: str, languages: List[str]) -> Optional[str]:
+    """
+    Fetch a transcript from YouTube, returning None if none can be found.
+    
+    Requests are paced by the shared rate limiter. When YouTube rate limits us,
+    retry with exponential backoff and jitter, up to TRANSCRIPT_MAX_ATTEMPTS.
+    """
+    for attempt in range(TRANSCRIPT_MAX_ATTEMPTS):
+        _transcript_limiter.acquire(1)
+        try:
+            return _request_video_transcript(video_id, languages)
+        except RequestBlocked:
+            if attempt == TRANSCRIPT_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(min(TRANSCRIPT_MAX_BACKOFF, 2 ** attempt) + random.uniform(0, 1))
+
+
+def _request_video_transcript(video_id: str, languages: List[str]) -> Optional[str]:
+    """Look up and download a transcript in the preferred languages."""
+    transcript_list = get_transcript_api().list(video_id)
+    
+    # Try the preferred languages first, then fall back to any manually
+    # created English transcript, then to an auto-generated one
+    lookups = (
+        (transcript_list.find_transcript, languages),
+        (transcript_list.find_manually_created_transcript, ['en']),
+        (transcript_list.find_generated_transcript, ['en']),
+    )
+    
+    for find, language_codes in lookups:
+        try:
+            return _join_transcript(find(language_codes).fetch())
+        except (NoTranscriptFound, TranscriptsDisabled):
+            continue
+    
+    return None
+
+
+def _join_transcript(transcript_data) -> str:
+    """Combine all transcript text segments into a single string."""
+    return ' '.join(snippet.text for snippet in transcript_data)
+
+
 def filter_videos_by_time(videos: List[Dict], hours: int = 24) -> List[Dict]:
     """
     Filter videos published within the last N hours.
     
     Args:
-        videos: List of video dictionaries with 'published_at' field
+        videos: List of video dictionaries with 'published_at' Unix timestamp
         hours: Number of hours to look back (default: 24)
     
     Returns:
@@ -185,14 +409,13 @@ def filter_videos_by_time(videos: List[Dict], hours: int = 24) -> List[Dict]:
     if not videos:
         return []
     
-    cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+    cutoff_ts = int(time.time()) - hours * 3600
     
     filtered = []
     for video in videos:
         published_at = video.get('published_at')
-        if published_at and isinstance(published_at, datetime):
-            if published_at >= cutoff_time:
-                filtered.append(video)
+        if isinstance(published_at, int) and published_at >= cutoff_ts:
+            filtered.append(video)
     
     return filtered
 
@@ -216,21 +439,33 @@ def fetch_channel_videos(
         List of video dictionaries with optional 'transcript' field
     """
     rss_url = get_channel_rss_url(channel_id)
-    all_videos = parse_rss_feed(rss_url)
-    recent_videos = filter_videos_by_time(all_videos, hours=hours)
+    cutoff = int(time.time()) - hours * 3600
+    recent_videos = parse_rss_feed(rss_url, cutoff=cutoff)
     
     if get_transcripts:
-        for video in recent_videos:
-            video_id = video.get('video_id')
-            if video_id:
-                transcript = get_video_transcript(video_id, languages=languages)
-                video['transcript'] = transcript
-            else:
-                video['transcript'] = None
+        _attach_transcripts(recent_videos, languages)
     
     return recent_videos
 
 
+def _attach_transcripts(videos: List[Dict], languages: List[str]) -> None:
+    """Fetch transcripts for the given videos and store them under 'transcript'."""
+    if not videos:
+        return
+    
+    # Each transcript takes several round-trips to YouTube, so fetch them
+    # concurrently; executor.map keeps results in video order
+    def fetch_transcript(video: Dict) -> Optional[str]:
+        video_id = video.get('video_id')
+        if video_id:
+            return get_video_transcript(video_id, languages=languages)
+        return None
+    
+    transcripts = _transcript_executor.map(fetch_transcript, videos)
+    for video, transcript in zip(videos, transcripts):
+        video['transcript'] = transcript
+
+
 def fetch_multiple_channels(
     channel_ids: List[str], 
     hours: int = 24, 
@@ -249,20 +484,99 @@ def fetch_multiple_channels(
     Returns:
         Dictionary mapping channel_id to list of recent videos
     """
-    results = {}
+    if not channel_ids:
+        return {}
     
-    for channel_id in channel_ids:
-        try:
-            videos = fetch_channel_videos(
-                channel_id, 
-                hours=hours, 
-                get_transcripts=get_transcripts,
-                languages=languages
-            )
-            results[channel_id] = videos
-        except Exception as e:
-            print(f"Error fetching videos for channel {channel_id}: {e}")
-            results[channel_id] = []
+    # Fetching is network-bound, so fan channels out across a thread pool.
+    # Pre-seed the results to keep them in the order the channels were given.
+    results = {channel_id: [] for channel_id in channel_ids}
+    
+    with ThreadPoolExecutor(max_workers=min(16, len(channel_ids))) as executor:
+        futures = {
+            executor.submit(
+                fetch_channel_videos,
+                channel_id,
+                hours,
+                get_transcripts,
+                languages
+            ): channel_id
+            for channel_id in channel_ids
+        }
+        
+        for future in as_completed(futures):
+            channel_id = futures[future]
+            try:
+                results[channel_id] = future.result()
+            except Exception as e:
+                logger.warning("Error fetching videos for channel %s: %s", channel_id, e)
+                results[channel_id] = []
     
     return results
 
+
+async def fetch_multiple_channels_async(
+    channel_ids: List[str], 
+    hours: int = 24, 
+    get_transcripts: bool = False,
+    languages: List[str] = ['en']
+) -> Dict[str, List[Dict]]:
+    """
+    Fetch videos from multiple YouTube channels on a single event loop.
+    
+    Asynchronous counterpart to fetch_multiple_channels for large channel
+    lists: feeds are downloaded concurrently with aiohttp (at most
+    ASYNC_MAX_CONNECTIONS at a time), while parsing and transcript fetching
+    run in the default executor. Feeds fetched this way bypass the RSS cache.
+    Channels waiting for a free connection are not subject to the timeout;
+    RSS_REQUEST_TIMEOUT only applies to connecting and to each socket read.
+    
+    Args:
+        channel_ids: List of YouTube channel IDs
+        hours: Number of hours to look back (default: 24)
+        get_transcripts: Whether to fetch transcripts (default: False)
+        languages: List of language codes for transcripts (default: ['en'])
+    
+    Returns:
+        Dictionary mapping channel_id to list of recent videos
+    """
+    if not channel_ids:
+        return {}
+    
+    loop = asyncio.get_running_loop()
+    cutoff = int(time.time()) - hours * 3600
+    connector = aiohttp.TCPConnector(limit=ASYNC_MAX_CONNECTIONS)
+    # A total timeout would also count the time spent queued for a free
+    # connection, failing channels at the back of long lists before they're sent
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=RSS_REQUEST_TIMEOUT,
+        sock_read=RSS_REQUEST_TIMEOUT,
+    )
+    
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def fetch_channel(channel_id: str) -> List[Dict]:
+            rss_url = get_channel_rss_url(channel_id)
+            async with session.get(rss_url) as response:
+                response.raise_for_status()
+                content = await response.read()
+            
+            # Parsing is CPU-bound and transcripts use blocking HTTP calls,
+            # so keep both off the event loop
+            videos = await loop.run_in_executor(None, _parse_feed_content, content, cutoff)
+            if get_transcripts:
+                await loop.run_in_executor(None, _attach_transcripts, videos, languages)
+            return videos
+        
+        channel_results = await asyncio.gather(
+            *(fetch_channel(channel_id) for channel_id in channel_ids),
+            return_exceptions=True
+        )
+    
+    results = {}
+    for channel_id, videos in zip(channel_ids, channel_results):
+        if isinstance(videos, Exception):
+            logger.warning("Error fetching videos for channel %s: %s", channel_id, videos)
+            results[channel_id] = []
+        else:
+            results[channel_id] = videos
+    
+    return results
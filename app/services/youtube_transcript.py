@@ -1,20 +1,35 @@
 """Service for fetching YouTube video transcripts."""
 
+import logging
+import threading
 from typing import Optional
 from youtube_transcript_api import YouTubeTranscriptApi
 
+logger = logging.getLogger(__name__)
+
+# YouTubeTranscriptApi wraps a requests.Session, which is not guaranteed to be
+# thread-safe, so keep one instance per thread rather than one per call
+_thread_local = threading.local()
+
+
+def get_transcript_api() -> YouTubeTranscriptApi:
+    """Get the calling thread's YouTubeTranscriptApi, creating it on first use."""
+    api = getattr(_thread_local, 'api', None)
+    if api is None:
+        api = YouTubeTranscriptApi()
+        _thread_local.api = api
+    return api
+
 
 def get_transcript(video_id: str) -> Optional[str]:
     """Get transcript for a YouTube video as plain text."""
     try:
-        ytt_api = YouTubeTranscriptApi()
-        transcript = ytt_api.fetch(video_id)
-        return transcript
-    except Exception:
+        return get_transcript_api().fetch(video_id)
+    except Exception as e:
+        logger.warning("Error fetching transcript for video %s: %s", video_id, e)
         return None
 
 if __name__ == "__main__":
     print(get_transcript("dTTLsmaVqBk"))
-    
-    ytt_api = YouTubeTranscriptApi()
-    result = ytt_api.fetch("dTTLsmaVqBk") 
\ No newline at end of file
+
+    result = get_transcript_api().fetch("dTTLsmaVqBk")
\ No newline at end of file
@@ -1,4 +1,11 @@
+import logging
+
+
 def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
     print("Hello from technewsaggregator!")
 
 